@@ -34,6 +34,10 @@ if KEEP_ARQ_TASK_POOL in [KEEP_ARQ_TASK_POOL_ALL, KEEP_ARQ_TASK_POOL_BASIC_PROCE
             "keep.api.tasks.process_incident_task.async_process_incident",
             KEEP_ARQ_QUEUE_BASIC,
         ),
+        (
+            "keep.api.tasks.process_incident_alerts_task.async_index_incident_alerts",
+            KEEP_ARQ_QUEUE_BASIC,
+        ),
     ]
 
 
@@ -68,12 +72,16 @@ def get_arq_worker(queue_name: str) -> Worker:
     expires = config(
         "ARQ_EXPIRES", cast=int, default=3600
     )  # the default length of time from when a job is expected to start after which the job expires, making it shorter to avoid clogging
+    poll_delay = config(
+        "ARQ_POLL_DELAY", cast=float, default=0.5
+    )  # how often (in seconds) the worker polls redis for new jobs, lower values pick up jobs faster at the cost of more redis calls
     # generate a worker id so each worker will have a different health check key
     worker_id = str(uuid4()).replace("-", "")
     worker = create_worker(
         WorkerSettings,
         keep_result=keep_result,
         expires_extra_ms=expires,
+        poll_delay=poll_delay,
         queue_name=queue_name,
         health_check_key=f"{queue_name}:{worker_id}:health-check",
     )
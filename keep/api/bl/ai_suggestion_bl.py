@@ -314,34 +314,42 @@ class AISuggestionBl:
             feedback_content=changes,
         )
 
-        for incident_with_feedback in incidents_with_feedback:
-            if not incident_with_feedback["accepted"]:
-                self.logger.info(
-                    f"Incident {incident_with_feedback['incident']['name']} rejected by user, skipping creation"
-                )
-                continue
-
-            try:
-                # Create the incident
-                incident_dto = IncidentDto.parse_obj(incident_with_feedback["incident"])
-                created_incident = incident_bl.create_incident(incident_dto, generated_from_ai=True)
-
-                # Add alerts to the created incident
-                alert_ids = [
-                    uuid.UUID(alert["event_id"])
-                    for alert in incident_with_feedback["incident"]["alerts"]
-                ]
-                await incident_bl.add_alerts_to_incident(created_incident.id, alert_ids)
-
-                committed_incidents.append(created_incident)
-                self.logger.info(
-                    f"Incident {incident_with_feedback['incident']['name']} created successfully"
-                )
-
-            except Exception as e:
-                self.logger.error(
-                    f"Failed to create incident {incident_with_feedback['incident']['name']}: {str(e)}"
-                )
+        # Notify the client once for all the committed incidents
+        async with incident_bl.batch_notifications():
+            for incident_with_feedback in incidents_with_feedback:
+                if not incident_with_feedback["accepted"]:
+                    self.logger.info(
+                        f"Incident {incident_with_feedback['incident']['name']} rejected by user, skipping creation"
+                    )
+                    continue
+
+                try:
+                    # Create the incident
+                    incident_dto = IncidentDto.parse_obj(
+                        incident_with_feedback["incident"]
+                    )
+                    created_incident = incident_bl.create_incident(
+                        incident_dto, generated_from_ai=True
+                    )
+
+                    # Add alerts to the created incident
+                    alert_ids = [
+                        uuid.UUID(alert["event_id"])
+                        for alert in incident_with_feedback["incident"]["alerts"]
+                    ]
+                    await incident_bl.add_alerts_to_incident(
+                        created_incident.id, alert_ids
+                    )
+
+                    committed_incidents.append(created_incident)
+                    self.logger.info(
+                        f"Incident {incident_with_feedback['incident']['name']} created successfully"
+                    )
+
+                except Exception as e:
+                    self.logger.error(
+                        f"Failed to create incident {incident_with_feedback['incident']['name']}: {str(e)}"
+                    )
 
         return committed_incidents
 
@@ -1,7 +1,8 @@
+import asyncio
+import functools
 import logging
 import os
-import pathlib
-import sys
+from contextlib import asynccontextmanager
 from typing import List, Optional
 from uuid import UUID
 
@@ -10,34 +11,34 @@ from pusher import Pusher
 from sqlmodel import Session
 
 from keep.api.arq_pool import get_pool
+from keep.api.consts import KEEP_ARQ_QUEUE_BASIC, REDIS
 from keep.api.core.db import (
     add_alerts_to_incident_by_incident_id,
     create_incident_from_dto,
-    delete_incident_by_id,
-    get_incident_alerts_by_incident_id,
+    delete_incident_returning,
     get_incident_by_id,
-    get_incident_unique_fingerprint_count,
+    get_incident_with_fingerprint_count,
     remove_alerts_to_incident_by_incident_id,
     update_incident_from_dto_by_id,
 )
-from keep.api.core.elastic import ElasticClient
 from keep.api.models.alert import IncidentDto, IncidentDtoIn
 from keep.api.models.db.alert import Incident
-from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
+from keep.api.tasks.process_incident_alerts_task import index_incident_alerts
 from keep.workflowmanager.workflowmanager import WorkflowManager
 
 MIN_INCIDENT_ALERTS_FOR_SUMMARY_GENERATION = int(
     os.environ.get("MIN_INCIDENT_ALERTS_FOR_SUMMARY_GENERATION", 5)
 )
+# Pusher accepts up to 10 events in a single batch trigger
+PUSHER_BATCH_SIZE = 10
 
-ee_enabled = os.environ.get("EE_ENABLED", "false") == "true"
-if ee_enabled:
-    path_with_ee = (
-        str(pathlib.Path(__file__).parent.resolve()) + "/../../../ee/experimental"
-    )
-    sys.path.insert(0, path_with_ee)
-else:
-    ALGORITHM_VERBOSE_NAME = NotImplemented
+EE_ENABLED = os.environ.get("EE_ENABLED", "false").lower() == "true"
+
+
+@functools.cache
+def _workflow_manager() -> WorkflowManager:
+    # resolved lazily on first use so importing this module doesn't create the manager
+    return WorkflowManager.get_instance()
 
 
 class IncidentBl:
@@ -48,8 +49,43 @@ class IncidentBl:
         self.session = session
         self.pusher_client = pusher_client
         self.logger = logging.getLogger(__name__)
-        self.ee_enabled = os.environ.get("EE_ENABLED", "false").lower() == "true"
-        self.redis = os.environ.get("REDIS", "false") == "true"
+        # when set, client notifications are buffered here until flushed
+        self._buffered_notifications: Optional[List[dict]] = None
+
+    @asynccontextmanager
+    async def batch_notifications(self):
+        """
+        Buffers the client notifications of all the incidents changed inside the block
+        and sends them together when the block exits.
+        """
+        self._buffered_notifications = []
+        try:
+            yield self
+        finally:
+            # the pusher client is blocking, flush in a thread so it won't block the event loop
+            await asyncio.to_thread(self.flush_client_notifications)
+            self._buffered_notifications = None
+
+    def flush_client_notifications(self):
+        """
+        Sends the buffered client notifications, PUSHER_BATCH_SIZE events per request.
+        """
+        if not self._buffered_notifications or self.pusher_client is None:
+            return
+
+        events, self._buffered_notifications = self._buffered_notifications, []
+        self.logger.debug(
+            "Pushing buffered incident changes to client",
+            extra={"tenant_id": self.tenant_id, "events_count": len(events)},
+        )
+        try:
+            for i in range(0, len(events), PUSHER_BATCH_SIZE):
+                self.pusher_client.trigger_batch(events[i : i + PUSHER_BATCH_SIZE])
+        except Exception:
+            self.logger.exception(
+                "Failed to push buffered incident changes to client",
+                extra={"tenant_id": self.tenant_id},
+            )
 
     def create_incident(
         self, incident_dto: IncidentDtoIn, generated_from_ai: bool = False
@@ -66,89 +102,157 @@ class IncidentBl:
         """
         self.logger.info(
             "Creating incident",
-            extra={"incident_dto": incident_dto.dict(), "tenant_id": self.tenant_id},
+            extra={
+                "incident_name": incident_dto.user_generated_name,
+                "tenant_id": self.tenant_id,
+            },
         )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Incident to create",
+                extra={
+                    "incident_dto": incident_dto.dict(),
+                    "tenant_id": self.tenant_id,
+                },
+            )
         incident = create_incident_from_dto(
             self.tenant_id, incident_dto, generated_from_ai=generated_from_ai
         )
-        self.logger.info(
-            "Incident created",
-            extra={"incident_id": incident.id, "tenant_id": self.tenant_id},
-        )
         new_incident_dto = IncidentDto.from_db_incident(incident)
-        self.logger.info(
-            "Incident DTO created",
-            extra={"incident_id": new_incident_dto.id, "tenant_id": self.tenant_id},
-        )
         self.__update_client_on_incident_change()
+        steps = ["created", "client_updated"]
+        if self.__run_workflows(new_incident_dto, "created"):
+            steps.append("workflows_run")
         self.logger.info(
-            "Client updated on incident change",
-            extra={"incident_id": new_incident_dto.id, "tenant_id": self.tenant_id},
-        )
-        self.__run_workflows(new_incident_dto, "created")
-        self.logger.info(
-            "Workflows run on incident",
-            extra={"incident_id": new_incident_dto.id, "tenant_id": self.tenant_id},
+            "Incident created",
+            extra={
+                "incident_id": new_incident_dto.id,
+                "tenant_id": self.tenant_id,
+                "steps": steps,
+            },
         )
         return new_incident_dto
 
     async def add_alerts_to_incident(
         self, incident_id: UUID, alert_ids: List[UUID], is_created_by_ai: bool = False
     ) -> None:
+        if not alert_ids:
+            # nothing to add, skip the DB, elastic, client and workflows round-trips
+            return
+
         self.logger.info(
             "Adding alerts to incident",
-            extra={"incident_id": incident_id, "alert_ids": alert_ids},
+            extra={
+                "incident_id": incident_id,
+                "tenant_id": self.tenant_id,
+                "alerts_count": len(alert_ids),
+            },
         )
-        incident = get_incident_by_id(tenant_id=self.tenant_id, incident_id=incident_id)
-        if not incident:
-            raise HTTPException(status_code=404, detail="Incident not found")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Alerts to add to incident",
+                extra={"incident_id": incident_id, "alert_ids": alert_ids},
+            )
+        # Both the lookup and the insert use the request session, so they share one
+        # connection checkout and one transaction (committed by the insert)
+        try:
+            incident_with_count = get_incident_with_fingerprint_count(
+                tenant_id=self.tenant_id,
+                incident_id=incident_id,
+                # the fingerprints count is only needed for summary generation
+                with_fingerprint_count=EE_ENABLED and REDIS,
+                session=self.session,
+            )
+            if not incident_with_count:
+                raise HTTPException(status_code=404, detail="Incident not found")
 
-        add_alerts_to_incident_by_incident_id(self.tenant_id, incident_id, alert_ids, is_created_by_ai)
-        self.logger.info(
-            "Alerts added to incident",
-            extra={"incident_id": incident_id, "alert_ids": alert_ids},
-        )
-        self.__update_elastic(incident_id, alert_ids)
-        self.logger.info(
-            "Alerts pushed to elastic",
-            extra={"incident_id": incident_id, "alert_ids": alert_ids},
-        )
-        self.__update_client_on_incident_change(incident_id)
-        self.logger.info(
-            "Client updated on incident change",
-            extra={"incident_id": incident_id, "alert_ids": alert_ids},
-        )
+            incident, fingerprints_count = incident_with_count
+            alerts_count_before = incident.alerts_count
+            incident = add_alerts_to_incident_by_incident_id(
+                self.tenant_id,
+                incident_id,
+                alert_ids,
+                is_created_by_ai,
+                session=self.session,
+                incident=incident,
+            )
+        except Exception:
+            # the session is shared with the caller, don't leave its transaction aborted
+            self.session.rollback()
+            raise
+        if fingerprints_count is not None:
+            # alerts_count tracks unique fingerprints, so the count can be advanced
+            # by the newly added fingerprints instead of being queried again
+            fingerprints_count += incident.alerts_count - alerts_count_before
         incident_dto = IncidentDto.from_db_incident(incident)
-        self.__run_workflows(incident_dto, "updated")
-        self.logger.info(
-            "Workflows run on incident",
-            extra={"incident_id": incident_id, "alert_ids": alert_ids},
+        # the side effects are independent of each other, run them concurrently
+        results = await asyncio.gather(
+            self.__update_elastic(incident_id, alert_ids),
+            self.__update_client_on_incident_change_async(incident_id),
+            asyncio.to_thread(self.__run_workflows, incident_dto, "updated"),
+            self.__generate_summary(incident_id, incident, fingerprints_count),
+            return_exceptions=True,
         )
-        await self.__generate_summary(incident_id, incident)
+        # each side effect returns whether it actually did its step
+        steps = ["alerts_added"]
+        for step, result in zip(
+            ["elastic_updated", "client_updated", "workflows_run", "summary_scheduled"],
+            results,
+        ):
+            if isinstance(result, Exception):
+                self.logger.error(
+                    "Failed to process incident change after adding alerts",
+                    exc_info=result,
+                    extra={"incident_id": incident_id, "tenant_id": self.tenant_id},
+                )
+            elif result:
+                steps.append(step)
         self.logger.info(
-            "Summary generated",
-            extra={"incident_id": incident_id, "alert_ids": alert_ids},
+            "Alerts added to incident",
+            extra={
+                "incident_id": incident_id,
+                "tenant_id": self.tenant_id,
+                "alerts_count": len(alert_ids),
+                "steps": steps,
+            },
         )
 
-    def __update_elastic(self, incident_id: UUID, alert_ids: List[UUID]):
+    async def __update_elastic(self, incident_id: UUID, alert_ids: List[UUID]) -> bool:
+        if not REDIS:
+            return await asyncio.to_thread(
+                index_incident_alerts, None, self.tenant_id, incident_id, alert_ids
+            )
+
         try:
-            elastic_client = ElasticClient(self.tenant_id)
-            if elastic_client.enabled:
-                db_alerts, _ = get_incident_alerts_by_incident_id(
-                    tenant_id=self.tenant_id,
-                    incident_id=incident_id,
-                    limit=len(alert_ids),
-                )
-                enriched_alerts_dto = convert_db_alerts_to_dto_alerts(
-                    db_alerts, with_incidents=True
-                )
-                elastic_client.index_alerts(alerts=enriched_alerts_dto)
+            pool = await get_pool()
+            job = await pool.enqueue_job(
+                "async_index_incident_alerts",
+                self.tenant_id,
+                incident_id,
+                alert_ids,
+                _queue_name=KEEP_ARQ_QUEUE_BASIC,
+            )
+            self.logger.info(
+                f"Pushing alerts to elastic for incident {incident_id} scheduled, job: {job}",
+                extra={"tenant_id": self.tenant_id, "incident_id": incident_id},
+            )
+            return True
         except Exception:
-            self.logger.exception("Failed to push alert to elasticsearch")
+            self.logger.exception("Failed to schedule pushing alerts to elasticsearch")
+            return False
 
     def __update_client_on_incident_change(self, incident_id: Optional[UUID] = None):
-        if self.pusher_client is not None:
-            self.logger.info(
+        if self.pusher_client is not None and self._buffered_notifications is not None:
+            event = {
+                "channel": f"private-{self.tenant_id}",
+                "name": "incident-change",
+                "data": {"incident_id": str(incident_id) if incident_id else None},
+            }
+            # the same change is pushed only once per batch
+            if event not in self._buffered_notifications:
+                self._buffered_notifications.append(event)
+        elif self.pusher_client is not None:
+            self.logger.debug(
                 "Pushing incident change to client",
                 extra={"incident_id": incident_id, "tenant_id": self.tenant_id},
             )
@@ -157,32 +261,47 @@ class IncidentBl:
                 "incident-change",
                 {"incident_id": str(incident_id) if incident_id else None},
             )
-            self.logger.info(
+            self.logger.debug(
                 "Incident change pushed to client",
                 extra={"incident_id": incident_id, "tenant_id": self.tenant_id},
             )
 
-    def __run_workflows(self, incident_dto: IncidentDto, action: str):
+    async def __update_client_on_incident_change_async(
+        self, incident_id: Optional[UUID] = None
+    ) -> bool:
+        if self.pusher_client is None:
+            return False
+        if self._buffered_notifications is not None:
+            # only buffered, nothing is sent until the batch is flushed
+            self.__update_client_on_incident_change(incident_id)
+        else:
+            # the pusher client is blocking, run it in a thread so it won't block the event loop
+            await asyncio.to_thread(
+                self.__update_client_on_incident_change, incident_id
+            )
+        return True
+
+    def __run_workflows(self, incident_dto: IncidentDto, action: str) -> bool:
         try:
-            workflow_manager = WorkflowManager.get_instance()
-            workflow_manager.insert_incident(self.tenant_id, incident_dto, action)
+            self.logger.debug("Adding incident to the workflow manager queue")
+            _workflow_manager().insert_incident(self.tenant_id, incident_dto, action)
+            self.logger.debug("Added incident to the workflow manager queue")
+            return True
         except Exception:
             self.logger.exception(
                 "Failed to run workflows based on incident",
                 extra={"incident_id": incident_dto.id, "tenant_id": self.tenant_id},
             )
+            return False
+
+    async def __generate_summary(
+        self, incident_id: UUID, incident: Incident, fingerprints_count: Optional[int]
+    ) -> bool:
+        if not (EE_ENABLED and REDIS) or incident.user_summary:
+            return False
 
-    async def __generate_summary(self, incident_id: UUID, incident: Incident):
         try:
-            fingerprints_count = get_incident_unique_fingerprint_count(
-                self.tenant_id, incident_id
-            )
-            if (
-                ee_enabled
-                and self.redis
-                and fingerprints_count > MIN_INCIDENT_ALERTS_FOR_SUMMARY_GENERATION
-                and not incident.user_summary
-            ):
+            if fingerprints_count > MIN_INCIDENT_ALERTS_FOR_SUMMARY_GENERATION:
                 pool = await get_pool()
                 job = await pool.enqueue_job(
                     "process_summary_generation",
@@ -196,20 +315,26 @@ class IncidentBl:
                         "incident_id": incident_id,
                     },
                 )
+                return True
         except Exception:
             self.logger.exception(
                 "Failed to generate summary for incident",
                 extra={"incident_id": incident_id, "tenant_id": self.tenant_id},
             )
+        return False
 
     def delete_alerts_from_incident(
         self, incident_id: UUID, alert_ids: List[UUID]
     ) -> None:
+        if not alert_ids:
+            return
+
         self.logger.info(
-            "Fetching incident",
+            "Deleting alerts from incident",
             extra={
                 "incident_id": incident_id,
                 "tenant_id": self.tenant_id,
+                "alerts_count": len(alert_ids),
             },
         )
         incident = get_incident_by_id(tenant_id=self.tenant_id, incident_id=incident_id)
@@ -220,35 +345,22 @@ class IncidentBl:
 
     def delete_incident(self, incident_id: UUID) -> None:
         self.logger.info(
-            "Fetching incident",
+            "Deleting incident",
             extra={
                 "incident_id": incident_id,
                 "tenant_id": self.tenant_id,
             },
         )
 
-        incident = get_incident_by_id(tenant_id=self.tenant_id, incident_id=incident_id)
+        incident = delete_incident_returning(
+            tenant_id=self.tenant_id, incident_id=incident_id
+        )
         if not incident:
             raise HTTPException(status_code=404, detail="Incident not found")
 
         incident_dto = IncidentDto.from_db_incident(incident)
-
-        deleted = delete_incident_by_id(
-            tenant_id=self.tenant_id, incident_id=incident_id
-        )
-        if not deleted:
-            raise HTTPException(status_code=404, detail="Incident not found")
         self.__update_client_on_incident_change()
-        try:
-            workflow_manager = WorkflowManager.get_instance()
-            self.logger.info("Adding incident to the workflow manager queue")
-            workflow_manager.insert_incident(self.tenant_id, incident_dto, "deleted")
-            self.logger.info("Added incident to the workflow manager queue")
-        except Exception:
-            self.logger.exception(
-                "Failed to run workflows based on incident",
-                extra={"incident_id": incident_dto.id, "tenant_id": self.tenant_id},
-            )
+        self.__run_workflows(incident_dto, "deleted")
 
     def update_incident(
         self,
@@ -257,7 +369,7 @@ class IncidentBl:
         generated_by_ai: bool,
     ) -> None:
         self.logger.info(
-            "Fetching incident",
+            "Updating incident",
             extra={
                 "incident_id": incident_id,
                 "tenant_id": self.tenant_id,
@@ -270,16 +382,5 @@ class IncidentBl:
             raise HTTPException(status_code=404, detail="Incident not found")
 
         new_incident_dto = IncidentDto.from_db_incident(incident)
-        try:
-            workflow_manager = WorkflowManager.get_instance()
-            self.logger.info("Adding incident to the workflow manager queue")
-            workflow_manager.insert_incident(
-                self.tenant_id, new_incident_dto, "updated"
-            )
-            self.logger.info("Added incident to the workflow manager queue")
-        except Exception:
-            self.logger.exception(
-                "Failed to run workflows based on incident",
-                extra={"incident_id": new_incident_dto.id, "tenant_id": self.tenant_id},
-            )
+        self.__run_workflows(new_incident_dto, "updated")
         return new_incident_dto
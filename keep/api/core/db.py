@@ -4,7 +4,9 @@ Keep main database module.
 This module contains the CRUD database functions for Keep.
 """
 
+import csv
 import hashlib
+import io
 import json
 import logging
 import random
@@ -23,8 +25,11 @@ from sqlalchemy import (
     and_,
     case,
     cast,
+    delete,
     desc,
+    distinct,
     func,
+    insert,
     literal,
     null,
     select,
@@ -81,6 +86,9 @@ engine = create_db_engine()
 SQLAlchemyInstrumentor().instrument(enable_commenter=True, engine=engine)
 
 
+# Above this amount of alerts, links are inserted with COPY when running on PostgreSQL with psycopg2
+ALERT_TO_INCIDENT_COPY_THRESHOLD = 100
+
 ALLOWED_INCIDENT_FILTERS = [
     "status",
     "severity",
@@ -3266,12 +3274,10 @@ def update_incident_from_dto_by_id(
 ) -> Optional[Incident]:
     with Session(engine) as session:
         incident = session.exec(
-            select(Incident)
-            .where(
+            select(Incident).where(
                 Incident.tenant_id == tenant_id,
                 Incident.id == incident_id,
             )
-            .options(joinedload(Incident.alerts))
         ).first()
 
         if not incident:
@@ -3313,34 +3319,54 @@ def get_incident_by_fingerprint(tenant_id: str, fingerprint: str) -> Optional[In
         ).one_or_none()
 
 
-def delete_incident_by_id(
+def delete_incident_returning(
     tenant_id: str,
     incident_id: UUID,
-) -> bool:
-    with Session(engine) as session:
-        incident = (
-            session.query(Incident)
-            .filter(
-                Incident.tenant_id == tenant_id,
-                Incident.id == incident_id,
-            )
-            .first()
-        )
+) -> Optional[Incident]:
+    """
+    Deletes an incident together with its associations with alerts.
 
-        # Delete all associations with alerts:
+    On PostgreSQL the deleted incident is returned by the DELETE statement itself
+    (DELETE ... RETURNING), other dialects fetch it in the same session before deleting it.
 
+    Returns:
+        Optional[Incident]: The deleted incident, or None if it was not found.
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        # Delete all associations with alerts:
         (
             session.query(AlertToIncident)
             .where(
                 AlertToIncident.tenant_id == tenant_id,
-                AlertToIncident.incident_id == incident.id,
+                AlertToIncident.incident_id == incident_id,
             )
             .delete()
         )
 
-        session.delete(incident)
+        if session.bind.dialect.name == "postgresql":
+            row = session.execute(
+                delete(Incident)
+                .where(
+                    Incident.tenant_id == tenant_id,
+                    Incident.id == incident_id,
+                )
+                .returning(*Incident.__table__.columns)
+            ).first()
+            incident = Incident(**row._mapping) if row else None
+        else:
+            incident = (
+                session.query(Incident)
+                .filter(
+                    Incident.tenant_id == tenant_id,
+                    Incident.id == incident_id,
+                )
+                .first()
+            )
+            if incident:
+                session.delete(incident)
+
         session.commit()
-        return True
+        return incident
 
 
 def get_incidents_count(
@@ -3363,7 +3389,16 @@ def get_incident_alerts_and_links_by_incident_id(
     offset: Optional[int] = 0,
     session: Optional[Session] = None,
     include_unlinked: bool = False,
-) -> tuple[List[tuple[Alert, AlertToIncident]], int]:
+    with_total_count: bool = True,
+    with_incidents: bool = False,
+) -> tuple[List[tuple[Alert, AlertToIncident]], Optional[int]]:
+    """
+    Get the last alert of each fingerprint linked to the incident, with its link.
+
+    Args:
+        with_total_count (bool): Also count all the alerts, otherwise the returned total is None
+        with_incidents (bool): Pre-load the incidents of each alert
+    """
     with existed_or_new_session(session) as session:
 
         last_fingerprints_subquery = (
@@ -3404,8 +3439,10 @@ def get_incident_alerts_and_links_by_incident_id(
             query = query.filter(
                 AlertToIncident.deleted_at == NULL_FOR_DELETED_AT,
             )
+        if with_incidents:
+            query = query.options(selectinload(Alert.incidents))
 
-    total_count = query.count()
+    total_count = query.count() if with_total_count else None
 
     if limit is not None and offset is not None:
         query = query.limit(limit).offset(offset)
@@ -3413,7 +3450,9 @@ def get_incident_alerts_and_links_by_incident_id(
     return query.all(), total_count
 
 
-def get_incident_alerts_by_incident_id(*args, **kwargs) -> tuple[List[Alert], int]:
+def get_incident_alerts_by_incident_id(
+    *args, **kwargs
+) -> tuple[List[Alert], Optional[int]]:
     """
     Unpacking (List[(Alert, AlertToIncident)], int) to (List[Alert], int).
     """
@@ -3529,13 +3568,21 @@ def add_alerts_to_incident_by_incident_id(
     alert_ids: List[UUID],
     is_created_by_ai: bool = False,
     session: Optional[Session] = None,
+    incident: Optional[Incident] = None,
 ) -> Optional[Incident]:
+    """
+    Adds alerts to the incident with the given id.
+
+    If the caller already loaded the incident, it can be passed with `incident`
+    to skip fetching it again.
+    """
     with existed_or_new_session(session) as session:
-        query = select(Incident).where(
-            Incident.tenant_id == tenant_id,
-            Incident.id == incident_id,
-        )
-        incident = session.exec(query).first()
+        if incident is None:
+            query = select(Incident).where(
+                Incident.tenant_id == tenant_id,
+                Incident.id == incident_id,
+            )
+            incident = session.exec(query).first()
 
         if not incident:
             return None
@@ -3544,6 +3591,40 @@ def add_alerts_to_incident_by_incident_id(
         )
 
 
+def should_copy_alert_to_incident_rows(session: Session, rows_count: int) -> bool:
+    """
+    COPY only pays off for large batches and is only available with psycopg2.
+    """
+    return (
+        session.bind.dialect.name == "postgresql"
+        and session.bind.dialect.driver == "psycopg2"
+        and rows_count > ALERT_TO_INCIDENT_COPY_THRESHOLD
+    )
+
+
+def copy_alert_to_incident_rows(session: Session, rows: List[dict]):
+    """
+    Insert alert to incident links using PostgreSQL COPY, which is considerably
+    faster than INSERT for large batches. Requires the psycopg2 driver.
+    """
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+
+    quoted_columns = ", ".join(f'"{column}"' for column in columns)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {AlertToIncident.__tablename__} ({quoted_columns}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
 def add_alerts_to_incident(
     tenant_id: str,
     incident: Incident,
@@ -3616,28 +3697,26 @@ def add_alerts_to_incident(
                 incident.alerts_count += alerts_data_for_incident["count"]
             else:
                 incident.alerts_count = alerts_data_for_incident["count"]
-            alert_to_incident_entries = [
-                AlertToIncident(
-                    alert_id=alert_id,
-                    incident_id=incident.id,
-                    tenant_id=tenant_id,
-                    is_created_by_ai=is_created_by_ai,
-                )
+            link_timestamp = datetime.utcnow()
+            alert_to_incident_rows = [
+                {
+                    "tenant_id": tenant_id,
+                    "timestamp": link_timestamp,
+                    "alert_id": alert_id,
+                    "incident_id": incident.id,
+                    "is_created_by_ai": is_created_by_ai,
+                    "deleted_at": NULL_FOR_DELETED_AT,
+                }
                 for alert_id in new_alert_ids
             ]
+            if should_copy_alert_to_incident_rows(session, len(alert_to_incident_rows)):
+                copy_alert_to_incident_rows(session, alert_to_incident_rows)
+            else:
+                # Insert all links with a single executemany statement instead of one ORM object per alert
+                session.execute(insert(AlertToIncident), alert_to_incident_rows)
 
-            for idx, entry in enumerate(alert_to_incident_entries):
-                session.add(entry)
-                if (idx + 1) % 100 == 0:
-                    logger.info(
-                        f"Added {idx + 1}/{len(alert_to_incident_entries)} alerts to incident {incident.id} in database",
-                        extra={
-                            "tags": {"tenant_id": tenant_id, "incident_id": incident.id}
-                        },
-                    )
-                    session.flush()
-            session.commit()
-
+            # The new links are visible within the transaction, so the links and the
+            # incident are committed together below
             started_at, last_seen_at = session.exec(
                 select(func.min(Alert.timestamp), func.max(Alert.timestamp))
                 .join(AlertToIncident, AlertToIncident.alert_id == Alert.id)
@@ -3657,18 +3736,50 @@ def add_alerts_to_incident(
             return incident
 
 
-def get_incident_unique_fingerprint_count(tenant_id: str, incident_id: str) -> int:
-    with Session(engine) as session:
-        return session.execute(
-            select(func.count(1))
-            .select_from(AlertToIncident)
-            .join(Alert, AlertToIncident.alert_id == Alert.id)
-            .where(
-                AlertToIncident.deleted_at == NULL_FOR_DELETED_AT,
-                Alert.tenant_id == tenant_id,
-                AlertToIncident.incident_id == incident_id,
+def get_incident_with_fingerprint_count(
+    tenant_id: str,
+    incident_id: str | UUID,
+    with_fingerprint_count: bool = True,
+    session: Optional[Session] = None,
+) -> Optional[Tuple[Incident, Optional[int]]]:
+    """
+    Get the incident together with the number of unique fingerprints linked to it,
+    using a single query.
+
+    Args:
+        with_fingerprint_count (bool): Count the fingerprints, otherwise the returned count is None
+        session (Optional[Session]): The database session or None
+
+    Returns:
+        Optional[Tuple[Incident, Optional[int]]]: The incident and its fingerprints count, or None if not found.
+    """
+    with existed_or_new_session(session) as session:
+        columns = [Incident]
+        if with_fingerprint_count:
+            columns.append(
+                select(func.count(distinct(Alert.fingerprint)))
+                .select_from(AlertToIncident)
+                .join(Alert, AlertToIncident.alert_id == Alert.id)
+                .where(
+                    AlertToIncident.deleted_at == NULL_FOR_DELETED_AT,
+                    AlertToIncident.tenant_id == tenant_id,
+                    AlertToIncident.incident_id == Incident.id,
+                )
+                .scalar_subquery()
             )
-        ).scalar()
+        result = session.exec(
+            select(*columns).where(
+                Incident.tenant_id == tenant_id,
+                Incident.id == incident_id,
+            )
+        ).first()
+
+    if not result:
+        return None
+    if not with_fingerprint_count:
+        return result, None
+    incident, count = result
+    return incident, count or 0
 
 
 def get_last_alerts_for_incidents(
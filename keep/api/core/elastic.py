@@ -1,8 +1,12 @@
+import datetime
+import json
 import logging
 import os
+from enum import Enum
+from functools import lru_cache
+from uuid import UUID
 
 from elasticsearch import ApiError, BadRequestError, Elasticsearch
-from elasticsearch.helpers import BulkIndexError, bulk
 
 from keep.api.core.db import get_enrichments
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
@@ -11,6 +15,31 @@ from keep.api.models.alert import AlertDto, AlertSeverity
 from keep.api.utils.cel_utils import preprocess_cel_expression
 from keep.api.utils.enrichment_helpers import parse_and_enrich_deleted_and_assignees
 
+# max size of a single _bulk request body, larger batches are split into several requests
+ELASTIC_BULK_MAX_BYTES = int(os.environ.get("ELASTIC_BULK_MAX_BYTES", 5 * 1024 * 1024))
+ELASTIC_COMPRESSION = os.environ.get("ELASTIC_COMPRESSION", "true").lower() == "true"
+
+
+def _json_default(obj):
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=32)
+def _get_elasticsearch(hosts: tuple[str, ...], **kwargs) -> Elasticsearch:
+    # the client holds the connection pool and is thread safe, so it is shared by
+    # all the ElasticClient instances with the same hosts and auth
+    return Elasticsearch(hosts=list(hosts), **kwargs)
+
 
 class ElasticClient:
 
@@ -70,15 +99,18 @@ class ElasticClient:
                 "No Elastic index suffix found although Elastic is enabled for single tenant"
             )
 
+        # compress request bodies, alerts are verbose JSON and bulk requests can be large
+        kwargs.setdefault("http_compress", ELASTIC_COMPRESSION)
+
         if any(basic_auth):
             self.logger.debug("Using basic auth for Elastic")
-            self._client = Elasticsearch(
-                basic_auth=basic_auth, hosts=self.hosts, **kwargs
+            self._client = _get_elasticsearch(
+                hosts=tuple(self.hosts), basic_auth=tuple(basic_auth), **kwargs
             )
         else:
             self.logger.debug("Using API key for Elastic")
-            self._client = Elasticsearch(
-                api_key=self.api_key, hosts=self.hosts, **kwargs
+            self._client = _get_elasticsearch(
+                hosts=tuple(self.hosts), api_key=self.api_key, **kwargs
             )
 
     @property
@@ -218,27 +250,43 @@ class ElasticClient:
         if not self.enabled:
             return
 
-        actions = []
+        # build the NDJSON body ourselves so each chunk is a single _bulk request
+        chunks = []
+        chunk = bytearray()
         for alert in alerts:
-            action = {
-                "_index": self.alerts_index,
-                "_id": alert.fingerprint,  # use fingerprint as the document ID
-                "_source": alert.dict(),
-            }
+            alert_dict = alert.dict()
             # change severity to number so we can sort by it
-            action["_source"]["severity"] = AlertSeverity(
-                action["_source"]["severity"].lower()
-            ).order
-            actions.append(action)
-
-        try:
-            success, failed = bulk(self._client, actions, refresh="true")
-            self.logger.info(
-                f"Successfully indexed {success} alerts. Failed to index {failed} alerts."
+            alert_dict["severity"] = AlertSeverity(alert_dict["severity"].lower()).order
+            operation = (
+                _dumps(
+                    {
+                        "index": {
+                            "_index": self.alerts_index,
+                            "_id": alert.fingerprint,  # use fingerprint as the document ID
+                        }
+                    }
+                )
+                + b"\n"
+                + _dumps(alert_dict)
+                + b"\n"
             )
-        except BulkIndexError as e:
-            self.logger.error(f"Failed to index alerts to Elastic: {e} {e.errors}")
-            raise Exception(f"Failed to index alerts to Elastic: {e} {e.errors}")
+            if chunk and len(chunk) + len(operation) > ELASTIC_BULK_MAX_BYTES:
+                chunks.append(bytes(chunk))
+                chunk = bytearray()
+            chunk += operation
+        if chunk:
+            chunks.append(bytes(chunk))
+
+        success, failed = 0, []
+        try:
+            for body in chunks:
+                response = self._client.bulk(operations=body, refresh="wait_for")
+                for item in response["items"]:
+                    result = item["index"]
+                    if result.get("error"):
+                        failed.append(result)
+                    else:
+                        success += 1
         except ApiError as e:
             self.logger.error(f"Failed to index alerts to Elastic: {e} {e.errors}")
             raise Exception(f"Failed to index alerts to Elastic: {e} {e.errors}")
@@ -246,6 +294,15 @@ class ElasticClient:
             self.logger.exception(f"Failed to index alerts to Elastic: {e}")
             raise Exception(f"Failed to index alerts to Elastic: {e}")
 
+        if failed:
+            self.logger.error(
+                f"Failed to index alerts to Elastic: {len(failed)} document(s) failed to index. {failed}"
+            )
+            raise Exception(
+                f"Failed to index alerts to Elastic: {len(failed)} document(s) failed to index. {failed}"
+            )
+        self.logger.info(f"Successfully indexed {success} alerts.")
+
     def enrich_alert(self, alert_fingerprint: str, alert_enrichments: dict):
         if not self.enabled:
             return
@@ -477,6 +477,11 @@ class IncidentDto(IncidentDtoIn):
 
     @root_validator(pre=True)
     def set_default_values(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        cls._set_default_status(values)
+        return values
+
+    @staticmethod
+    def _set_default_status(values: Dict[str, Any]) -> None:
         # Check and set default status
         status = values.get("status")
         try:
@@ -487,18 +492,16 @@ class IncidentDto(IncidentDtoIn):
                 extra={"event": values},
             )
             values["status"] = IncidentStatus.FIRING
-        return values
-
-    @classmethod
-    def from_db_incident(cls, db_incident: "Incident"):
 
+    @staticmethod
+    def _fields_from_db_incident(db_incident: "Incident") -> Dict[str, Any]:
         severity = (
             IncidentSeverity.from_number(db_incident.severity)
             if isinstance(db_incident.severity, int)
             else db_incident.severity
         )
 
-        dto = cls(
+        return dict(
             id=db_incident.id,
             user_generated_name=db_incident.user_generated_name,
             ai_generated_name=db_incident.ai_generated_name,
@@ -524,10 +527,31 @@ class IncidentDto(IncidentDtoIn):
             merged_at=db_incident.merged_at,
         )
 
+    @classmethod
+    def from_db_incident(cls, db_incident: "Incident"):
+        dto = cls(**cls._fields_from_db_incident(db_incident))
+
         # This field is required for getting alerts when required
         dto._tenant_id = db_incident.tenant_id
         return dto
 
+    @classmethod
+    def from_db_incidents(cls, db_incidents: List["Incident"]) -> List["IncidentDto"]:
+        """
+        Bulk version of from_db_incident for endpoints returning many incidents.
+        The values come from the database, so they are not validated again here
+        (FastAPI still validates them against the endpoint's response model).
+        """
+        dtos = []
+        for db_incident in db_incidents:
+            fields = cls._fields_from_db_incident(db_incident)
+            # construct() skips the root validator, apply its status default
+            cls._set_default_status(fields)
+            dto = cls.construct(**fields)
+            dto._tenant_id = db_incident.tenant_id
+            dtos.append(dto)
+        return dtos
+
     def to_db_incident(self) -> "Incident":
         """Converts an IncidentDto instance to an Incident database model."""
         from keep.api.models.db.alert import Incident
@@ -72,6 +72,17 @@ class AlertToIncident(SQLModel, table=True):
         default=NULL_FOR_DELETED_AT,
     )
 
+    __table_args__ = (
+        # Incident alerts are always looked up by incident, the PK starts with alert_id so it can't be used for that
+        Index(
+            "ix_alerttoincident_tenant_incident",
+            "tenant_id",
+            "incident_id",
+            "deleted_at",
+            "alert_id",
+        ),
+    )
+
 
 class Incident(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
@@ -0,0 +1,30 @@
+"""Adding index on alert to incident by incident
+
+Revision ID: 4a1c0e6d2b7f
+Revises: 3f056d747d9e
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4a1c0e6d2b7f"
+down_revision = "3f056d747d9e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Using batch operation to ensure compatibility with multiple databases
+    with op.batch_alter_table("alerttoincident", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_alerttoincident_tenant_incident",
+            ["tenant_id", "incident_id", "deleted_at", "alert_id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("alerttoincident", schema=None) as batch_op:
+        batch_op.drop_index("ix_alerttoincident_tenant_incident")
@@ -167,9 +167,7 @@ def get_all_incidents(
         allowed_incident_ids=allowed_incident_ids,
     )
 
-    incidents_dto = []
-    for incident in incidents:
-        incidents_dto.append(IncidentDto.from_db_incident(incident))
+    incidents_dto = IncidentDto.from_db_incidents(incidents)
 
     logger.info(
         "Fetched incidents from DB",
@@ -395,9 +393,7 @@ def get_future_incidents_for_an_incident(
         offset=offset,
         incident_id=incident_id,
     )
-    future_incidents = [
-        IncidentDto.from_db_incident(incident) for incident in db_incidents
-    ]
+    future_incidents = IncidentDto.from_db_incidents(db_incidents)
     logger.info(
         "Fetched future incidents from DB",
         extra={
@@ -722,17 +718,6 @@ async def commit_with_ai(
         incident_bl=incident_bl,
     )
 
-    # Notify about changes if pusher client is available
-    if pusher_client:
-        try:
-            pusher_client.trigger(
-                f"private-{tenant_id}",
-                "incident-change",
-                {},
-            )
-        except Exception as e:
-            logger.error(f"Failed to notify client: {str(e)}")
-
     return committed_incidents
 
 
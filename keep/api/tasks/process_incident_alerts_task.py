@@ -0,0 +1,45 @@
+import logging
+from uuid import UUID
+
+from keep.api.core.db import get_incident_alerts_by_incident_id
+from keep.api.core.elastic import ElasticClient
+from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
+
+logger = logging.getLogger(__name__)
+
+
+def index_incident_alerts(
+    ctx: dict | None,
+    tenant_id: str,
+    incident_id: UUID,
+    alert_ids: list[UUID],
+) -> bool:
+    extra = {"tenant_id": tenant_id, "incident_id": incident_id}
+
+    if ctx and isinstance(ctx, dict):
+        extra["job_try"] = ctx.get("job_try", 0)
+        extra["job_id"] = ctx.get("job_id", None)
+
+    try:
+        elastic_client = ElasticClient(tenant_id)
+        if elastic_client.enabled:
+            db_alerts, _ = get_incident_alerts_by_incident_id(
+                tenant_id=tenant_id,
+                incident_id=incident_id,
+                limit=len(alert_ids),
+                with_total_count=False,
+                with_incidents=True,
+            )
+            enriched_alerts_dto = convert_db_alerts_to_dto_alerts(
+                db_alerts, with_incidents=True
+            )
+            elastic_client.index_alerts(alerts=enriched_alerts_dto)
+            logger.info("Incident alerts pushed to elastic", extra=extra)
+            return True
+    except Exception:
+        logger.exception("Failed to push alert to elasticsearch", extra=extra)
+    return False
+
+
+async def async_index_incident_alerts(*args, **kwargs):
+    return index_incident_alerts(*args, **kwargs)
@@ -0,0 +1,135 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from keep.api.core import elastic
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.core.elastic import ElasticClient
+from keep.api.models.alert import AlertDto, AlertSeverity
+
+
+@pytest.fixture
+def mocked_elastic_client(db_session, monkeypatch):
+    monkeypatch.setenv("ELASTIC_ENABLED", "true")
+    monkeypatch.setenv("ELASTIC_API_KEY", "test")
+    monkeypatch.setenv("ELASTIC_HOSTS", "http://localhost:9200")
+    monkeypatch.setenv("ELASTIC_INDEX_SUFFIX", "test")
+    elastic_client = ElasticClient(tenant_id=SINGLE_TENANT_UUID)
+    elastic_client._client = Mock()
+    elastic_client._client.bulk.side_effect = lambda operations, **kwargs: {
+        "items": [
+            {"index": {"_id": json.loads(line)["index"]["_id"], "status": 201}}
+            for line in operations.splitlines()[::2]
+        ]
+    }
+    return elastic_client
+
+
+def _alerts(count):
+    return [
+        AlertDto(
+            id=f"alert-{i}",
+            name="some-test-event",
+            status="firing",
+            severity="critical",
+            lastReceived="2024-10-26T17:03:00.000Z",
+            source=["keep"],
+            fingerprint=f"fp-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def _body_lines(body):
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_index_alerts_single_bulk_request(mocked_elastic_client):
+    mocked_elastic_client.index_alerts(_alerts(3))
+
+    (call,) = mocked_elastic_client._client.bulk.call_args_list
+    assert call.kwargs["refresh"] == "wait_for"
+    body = call.kwargs["operations"]
+    assert body.endswith(b"\n")
+
+    lines = _body_lines(body)
+    assert [line["index"]["_id"] for line in lines[::2]] == ["fp-0", "fp-1", "fp-2"]
+    assert all(
+        line["index"]["_index"] == mocked_elastic_client.alerts_index
+        for line in lines[::2]
+    )
+    # severity is indexed as its order so it can be sorted by
+    assert {line["severity"] for line in lines[1::2]} == {AlertSeverity.CRITICAL.order}
+
+
+def test_index_alerts_splits_chunks(mocked_elastic_client, monkeypatch):
+    alerts = _alerts(5)
+    mocked_elastic_client.index_alerts(alerts[:1])
+    operation_size = len(
+        mocked_elastic_client._client.bulk.call_args.kwargs["operations"]
+    )
+    mocked_elastic_client._client.bulk.reset_mock()
+    # room for two operations (action + document) per request
+    monkeypatch.setattr(elastic, "ELASTIC_BULK_MAX_BYTES", 2 * operation_size)
+
+    mocked_elastic_client.index_alerts(alerts)
+
+    bodies = [
+        call.kwargs["operations"]
+        for call in mocked_elastic_client._client.bulk.call_args_list
+    ]
+    assert [len(_body_lines(body)) // 2 for body in bodies] == [2, 2, 1]
+    assert all(len(body) <= elastic.ELASTIC_BULK_MAX_BYTES for body in bodies)
+    indexed = [
+        line["index"]["_id"] for body in bodies for line in _body_lines(body)[::2]
+    ]
+    assert indexed == [f"fp-{i}" for i in range(5)]
+
+
+def test_index_alerts_oversized_alert_is_sent_alone(mocked_elastic_client, monkeypatch):
+    monkeypatch.setattr(elastic, "ELASTIC_BULK_MAX_BYTES", 1)
+
+    mocked_elastic_client.index_alerts(_alerts(2))
+
+    assert mocked_elastic_client._client.bulk.call_count == 2
+
+
+def test_index_alerts_raises_on_failed_items(mocked_elastic_client):
+    mocked_elastic_client._client.bulk.side_effect = None
+    mocked_elastic_client._client.bulk.return_value = {
+        "errors": True,
+        "items": [
+            {"index": {"_id": "fp-0", "status": 201}},
+            {
+                "index": {
+                    "_id": "fp-1",
+                    "status": 400,
+                    "error": {"type": "mapper_parsing_exception"},
+                }
+            },
+        ],
+    }
+
+    with pytest.raises(Exception, match="1 document\\(s\\) failed to index"):
+        mocked_elastic_client.index_alerts(_alerts(2))
+
+
+def test_elastic_transport_is_shared(db_session, monkeypatch):
+    monkeypatch.setenv("ELASTIC_ENABLED", "true")
+    monkeypatch.setenv("ELASTIC_API_KEY", "test")
+    monkeypatch.setenv("ELASTIC_HOSTS", "http://localhost:9200")
+    monkeypatch.setenv("ELASTIC_INDEX_SUFFIX", "test")
+
+    elastic_client = ElasticClient(tenant_id=SINGLE_TENANT_UUID)
+    assert ElasticClient(tenant_id=SINGLE_TENANT_UUID)._client is elastic_client._client
+
+    monkeypatch.setenv("ELASTIC_HOSTS", "http://other-host:9200")
+    assert (
+        ElasticClient(tenant_id=SINGLE_TENANT_UUID)._client
+        is not elastic_client._client
+    )
+
+    # enabled is still resolved for every client
+    monkeypatch.setenv("ELASTIC_ENABLED", "false")
+    assert not ElasticClient(tenant_id=SINGLE_TENANT_UUID).enabled
@@ -1,30 +1,46 @@
+import asyncio
+import csv
+import uuid
 from datetime import datetime
 from itertools import cycle
+from unittest.mock import Mock, patch
 
 import pytest
-from sqlalchemy import distinct, func
+from sqlalchemy import distinct, func, insert, select
 from sqlalchemy.orm.exc import DetachedInstanceError
 
+from keep.api.bl.incidents_bl import IncidentBl
 from keep.api.core.db import (
     IncidentSorting,
     add_alerts_to_incident_by_incident_id,
+    copy_alert_to_incident_rows,
     create_incident_from_dict,
+    delete_incident_returning,
     get_alerts_data_for_incident,
     get_incident_alerts_by_incident_id,
     get_incident_by_id,
+    get_incident_with_fingerprint_count,
     get_last_incidents,
     merge_incidents_to_id,
     remove_alerts_to_incident_by_incident_id,
+    should_copy_alert_to_incident_rows,
 )
 from keep.api.core.db_utils import get_json_extract_field
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.models.alert import (
     AlertSeverity,
     AlertStatus,
+    IncidentDto,
+    IncidentDtoIn,
     IncidentSeverity,
     IncidentStatus,
 )
-from keep.api.models.db.alert import Alert, AlertToIncident
+from keep.api.models.db.alert import (
+    NULL_FOR_DELETED_AT,
+    Alert,
+    AlertToIncident,
+    Incident,
+)
 from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
 from tests.fixtures.client import client, test_app  # noqa
 
@@ -494,6 +510,307 @@ def test_add_alerts_with_same_fingerprint_to_incident(db_session, create_alert):
     assert len(incident.alerts) == 0
 
 
+def test_get_incident_with_fingerprint_count(db_session, create_alert):
+    for i in range(3):
+        create_alert(
+            f"fp{i % 2}",
+            AlertStatus.FIRING,
+            datetime.utcnow(),
+            {"severity": AlertSeverity.CRITICAL.value},
+        )
+
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID, {"user_generated_name": "test", "user_summary": "test"}
+    )
+
+    incident_from_db, fingerprints_count = get_incident_with_fingerprint_count(
+        SINGLE_TENANT_UUID, incident.id
+    )
+    assert incident_from_db.id == incident.id
+    assert fingerprints_count == 0
+
+    db_alerts = db_session.query(Alert).all()
+    add_alerts_to_incident_by_incident_id(
+        SINGLE_TENANT_UUID, incident.id, [a.id for a in db_alerts]
+    )
+
+    incident_from_db, fingerprints_count = get_incident_with_fingerprint_count(
+        SINGLE_TENANT_UUID, incident.id
+    )
+    assert fingerprints_count == 2
+    assert incident_from_db.alerts_count == 2
+
+    incident_from_db, fingerprints_count = get_incident_with_fingerprint_count(
+        SINGLE_TENANT_UUID, incident.id, with_fingerprint_count=False
+    )
+    assert incident_from_db.id == incident.id
+    assert fingerprints_count is None
+
+    assert get_incident_with_fingerprint_count("other-tenant", incident.id) is None
+
+
+def test_delete_incident_returning(db_session, create_alert):
+    create_alert(
+        "fp1",
+        AlertStatus.FIRING,
+        datetime.utcnow(),
+        {"severity": AlertSeverity.CRITICAL.value},
+    )
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID, {"user_generated_name": "test", "user_summary": "test"}
+    )
+    add_alerts_to_incident_by_incident_id(
+        SINGLE_TENANT_UUID, incident.id, [a.id for a in db_session.query(Alert).all()]
+    )
+
+    deleted = delete_incident_returning(SINGLE_TENANT_UUID, incident.id)
+
+    assert deleted.id == incident.id
+    assert deleted.user_generated_name == "test"
+    assert get_incident_by_id(SINGLE_TENANT_UUID, incident.id) is None
+    assert db_session.query(func.count(AlertToIncident.alert_id)).scalar() == 0
+    assert delete_incident_returning(SINGLE_TENANT_UUID, incident.id) is None
+
+
+def test_incident_from_returned_row(db_session, create_alert):
+    create_alert(
+        "fp1",
+        AlertStatus.FIRING,
+        datetime.utcnow(),
+        {"severity": AlertSeverity.CRITICAL.value},
+    )
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID,
+        {
+            "user_generated_name": "test",
+            "user_summary": "test",
+            "assignee": "assignee",
+        },
+    )
+    incident = add_alerts_to_incident_by_incident_id(
+        SINGLE_TENANT_UUID, incident.id, [a.id for a in db_session.query(Alert).all()]
+    )
+
+    # the same columns DELETE ... RETURNING returns on PostgreSQL
+    row = db_session.execute(
+        select(*Incident.__table__.columns).where(Incident.id == incident.id)
+    ).first()
+    transient_incident = Incident(**row._mapping)
+
+    orm_incident = get_incident_by_id(SINGLE_TENANT_UUID, incident.id)
+    assert (
+        IncidentDto.from_db_incident(transient_incident).dict()
+        == IncidentDto.from_db_incident(orm_incident).dict()
+    )
+
+
+def test_incident_dto_from_db_incidents(db_session, create_alert):
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID,
+        {
+            "user_generated_name": "test",
+            "user_summary": "test",
+            "sources": ["source_1"],
+            "affected_services": ["service_1"],
+        },
+    )
+    incident = get_incident_by_id(SINGLE_TENANT_UUID, incident.id)
+
+    (dto,) = IncidentDto.from_db_incidents([incident])
+
+    assert dto.dict() == IncidentDto.from_db_incident(incident).dict()
+    assert dto.status == IncidentStatus.FIRING
+    assert dto.severity == IncidentSeverity.CRITICAL
+    assert dto._tenant_id == SINGLE_TENANT_UUID
+
+    # an unknown status falls back to the same default as validated instances
+    incident.status = "unknown"
+    (dto,) = IncidentDto.from_db_incidents([incident])
+    assert dto.status == IncidentDto.from_db_incident(incident).status
+    assert dto.status == IncidentStatus.FIRING
+
+
+def test_add_alerts_to_incident_rolls_back_shared_session(db_session, create_alert):
+    create_alert(
+        "fp1",
+        AlertStatus.FIRING,
+        datetime.utcnow(),
+        {"severity": AlertSeverity.CRITICAL.value},
+    )
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID, {"user_generated_name": "test", "user_summary": "test"}
+    )
+    alert_ids = [a.id for a in db_session.query(Alert).all()]
+
+    incident_bl = IncidentBl(tenant_id=SINGLE_TENANT_UUID, session=db_session)
+    with patch(
+        "keep.api.bl.incidents_bl.add_alerts_to_incident_by_incident_id",
+        side_effect=RuntimeError("insert failed"),
+    ), patch.object(db_session, "rollback", wraps=db_session.rollback) as rollback:
+        with pytest.raises(RuntimeError):
+            asyncio.run(incident_bl.add_alerts_to_incident(incident.id, alert_ids))
+
+    rollback.assert_called_once()
+    # the shared session is still usable by the caller
+    assert db_session.query(func.count(AlertToIncident.alert_id)).scalar() == 0
+
+    asyncio.run(incident_bl.add_alerts_to_incident(incident.id, alert_ids))
+    assert get_incident_by_id(SINGLE_TENANT_UUID, incident.id).alerts_count == 1
+
+
+def test_add_alerts_to_incident_logs_done_steps(
+    db_session, create_alert, caplog, monkeypatch
+):
+    monkeypatch.setenv("ELASTIC_ENABLED", "false")
+    create_alert(
+        "fp1",
+        AlertStatus.FIRING,
+        datetime.utcnow(),
+        {"severity": AlertSeverity.CRITICAL.value},
+    )
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID, {"user_generated_name": "test", "user_summary": "test"}
+    )
+    alert_ids = [a.id for a in db_session.query(Alert).all()]
+
+    # no pusher client, elastic disabled and the incident already has a summary
+    incident_bl = IncidentBl(tenant_id=SINGLE_TENANT_UUID, session=db_session)
+    with caplog.at_level("INFO", logger="keep.api.bl.incidents_bl"):
+        asyncio.run(incident_bl.add_alerts_to_incident(incident.id, alert_ids))
+
+    (record,) = [r for r in caplog.records if r.msg == "Alerts added to incident"]
+    assert record.steps[0] == "alerts_added"
+    assert "elastic_updated" not in record.steps
+    assert "client_updated" not in record.steps
+    assert "summary_scheduled" not in record.steps
+
+
+def test_batch_incident_notifications(db_session, create_alert):
+    create_alert(
+        "fp1",
+        AlertStatus.FIRING,
+        datetime.utcnow(),
+        {"severity": AlertSeverity.CRITICAL.value},
+    )
+    alert_ids = [a.id for a in db_session.query(Alert).all()]
+
+    pusher_client = Mock()
+    incident_bl = IncidentBl(
+        tenant_id=SINGLE_TENANT_UUID, session=db_session, pusher_client=pusher_client
+    )
+
+    async def commit_incidents():
+        async with incident_bl.batch_notifications():
+            for i in range(11):
+                incident_dto = incident_bl.create_incident(
+                    IncidentDtoIn(user_generated_name=f"test-{i}", user_summary="test")
+                )
+                await incident_bl.add_alerts_to_incident(incident_dto.id, alert_ids)
+            # nothing is sent until the block exits
+            pusher_client.trigger.assert_not_called()
+            pusher_client.trigger_batch.assert_not_called()
+
+    asyncio.run(commit_incidents())
+
+    pusher_client.trigger.assert_not_called()
+    batches = [c.args[0] for c in pusher_client.trigger_batch.call_args_list]
+    # 11 incident changes + a single (deduplicated) change for all the creations
+    assert [len(batch) for batch in batches] == [10, 2]
+    events = [event["data"]["incident_id"] for batch in batches for event in batch]
+    assert len(set(events)) == len(events) == 12
+    assert None in events
+
+
+def test_copy_alert_to_incident_rows():
+    alert_id, incident_id = uuid.uuid4(), uuid.uuid4()
+    timestamp = datetime(2024, 10, 26, 17, 3, 0, 123456)
+    rows = [
+        {
+            "tenant_id": SINGLE_TENANT_UUID,
+            "timestamp": timestamp,
+            "alert_id": alert_id,
+            "incident_id": incident_id,
+            "is_created_by_ai": False,
+            "deleted_at": NULL_FOR_DELETED_AT,
+        }
+    ]
+
+    copied = {}
+    session = Mock()
+    cursor = session.connection().connection.cursor()
+    cursor.copy_expert.side_effect = lambda sql, buffer: copied.update(
+        sql=sql, rows=list(csv.reader(buffer.read().splitlines()))
+    )
+
+    copy_alert_to_incident_rows(session, rows)
+
+    assert copied["sql"] == (
+        'COPY alerttoincident ("tenant_id", "timestamp", "alert_id", "incident_id",'
+        ' "is_created_by_ai", "deleted_at") FROM STDIN WITH (FORMAT csv)'
+    )
+    assert copied["rows"] == [
+        [
+            SINGLE_TENANT_UUID,
+            "2024-10-26 17:03:00.123456",
+            str(alert_id),
+            str(incident_id),
+            "False",
+            "1000-01-01 00:00:00",
+        ]
+    ]
+    cursor.close.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "dialect, driver, rows_count, expected",
+    [
+        ("postgresql", "psycopg2", 101, True),
+        ("postgresql", "psycopg2", 100, False),
+        ("postgresql", "asyncpg", 101, False),
+        ("mysql", "pymysql", 101, False),
+        ("sqlite", "pysqlite", 101, False),
+    ],
+)
+def test_should_copy_alert_to_incident_rows(dialect, driver, rows_count, expected):
+    session = Mock()
+    session.bind.dialect.name = dialect
+    session.bind.dialect.driver = driver
+
+    assert should_copy_alert_to_incident_rows(session, rows_count) is expected
+
+
+def test_add_alerts_to_incident_uses_copy(db_session, create_alert):
+    for i in range(3):
+        create_alert(
+            f"fp{i}",
+            AlertStatus.FIRING,
+            datetime.utcnow(),
+            {"severity": AlertSeverity.CRITICAL.value},
+        )
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID, {"user_generated_name": "test", "user_summary": "test"}
+    )
+    alert_ids = [a.id for a in db_session.query(Alert).all()]
+
+    with patch(
+        "keep.api.core.db.should_copy_alert_to_incident_rows", return_value=True
+    ), patch(
+        "keep.api.core.db.copy_alert_to_incident_rows",
+        # COPY isn't available here, insert the same rows instead
+        side_effect=lambda session, rows: session.execute(
+            insert(AlertToIncident), rows
+        ),
+    ) as copy_rows:
+        incident = add_alerts_to_incident_by_incident_id(
+            SINGLE_TENANT_UUID, incident.id, alert_ids
+        )
+
+    (_, rows), _ = copy_rows.call_args
+    assert sorted(row["alert_id"] for row in rows) == sorted(alert_ids)
+    assert all(row["deleted_at"] == NULL_FOR_DELETED_AT for row in rows)
+    assert incident.alerts_count == 3
+
+
 def test_merge_incidents(db_session, create_alert, setup_stress_alerts_no_elastic):
     incident_1 = create_incident_from_dict(
         SINGLE_TENANT_UUID,